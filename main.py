@@ -1,18 +1,110 @@
 import os
 import asyncio
-import aiohttp
+import httpx
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-import pytz
+import sqlite3
+import time
+import numpy as np
+import orjson
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from string import Template
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
 from telegram import Bot
+from telegram.error import RetryAfter
 from telegram.ext import Application
 import json
+from collections import OrderedDict
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+IST = ZoneInfo('Asia/Kolkata')
+DISPLAY_TIME_FORMAT = '%d/%m/%Y %H:%M'
+
+ALERT_TEMPLATE = Template("""$emoji RSI ALERT $emoji
+
+💱 Pair: $symbol
+⏰ Timeframe: $interval
+📊 RSI(14): $rsi
+💰 Price: $price
+🕐 IST: $ist_time
+
+$signal_type
+$action
+
+━━━━━━━━━━━━━━━
+⚠️ Not financial advice""")
+
+@lru_cache(maxsize=256)
+def _ts_to_ist(timestamp: str) -> str:
+    """Convert an API candle timestamp to an IST display string"""
+    utc_time = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    return utc_time.astimezone(IST).strftime(DISPLAY_TIME_FORMAT)
+
+STARTUP_TEMPLATE = """🚀 Forex RSI Bot Started!
+
+📊 Monitoring: {pairs} pairs
+⏰ Timeframes: 1h & 4h (synced to candle closes)
+📈 RSI Oversold: ≤ {oversold}
+📉 RSI Overbought: ≥ {overbought}
+
+🕐 Current IST: {now}
+😴 Sleep Schedule: 2:00 AM - 5:00 AM IST
+
+Expected daily usage: ~{daily_requests} API requests"""
+
+SLEEP_TEMPLATE = """😴 Going to Sleep Mode
+
+🕐 IST Time: {now}
+⏰ Wake up at: {wake} IST
+
+Markets are quiet during these hours.
+Will resume monitoring at 5:00 AM IST.
+
+Sweet dreams! 🌙"""
+
+WAKE_TEMPLATE = """☀️ Good Morning! Bot is Awake
+
+🕐 IST Time: {now}
+🔍 Resuming RSI monitoring...
+📊 Watching {pairs} pairs on 1h & 4h timeframes
+
+Ready to catch those RSI signals! 🎯"""
+
+# Alerts from one check are combined into as few Telegram messages as possible
+ALERT_SEPARATOR = "\n\n━━━━━━━━━━\n\n"
+MAX_MESSAGE_LENGTH = 3800  # Telegram allows 4096 characters per message
+
+class AsyncTokenBucket:
+    """Token bucket allowing bursts of up to `rate` requests, refilled at `rate` per `per` seconds"""
+    
+    def __init__(self, rate: int, per: float = 60.0):
+        self.capacity = rate
+        self.fill_rate = rate / per
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.fill_rate)
+        self._updated = now
+    
+    async def acquire(self, tokens: int = 1):
+        """Wait until `tokens` are available and take them, serving callers in order"""
+        # Requests larger than the bucket wait for a full bucket and leave it in debt
+        needed = min(tokens, self.capacity)
+        async with self._lock:
+            self._refill()
+            if self._tokens < needed:
+                # Holding the lock while waiting keeps later (smaller) requests from jumping ahead
+                await asyncio.sleep((needed - self._tokens) / self.fill_rate)
+                self._refill()
+            self._tokens -= tokens
+
 class ForexRSIBot:
     def __init__(self):
         self.telegram_token = os.getenv('TELEGRAM_BOT_TOKEN')
@@ -20,7 +112,7 @@ class ForexRSIBot:
         self.chat_id = os.getenv('TELEGRAM_CHAT_ID')
         
         # 28 major forex pairs
-        self.forex_pairs = [
+        self.forex_pairs: Tuple[str, ...] = (
             # Major pairs
             'EUR/USD', 'GBP/USD', 'USD/JPY', 'USD/CHF', 'AUD/USD', 'USD/CAD', 'NZD/USD',
             # Minor pairs  
@@ -29,77 +121,172 @@ class ForexRSIBot:
             'CHF/JPY', 'AUD/JPY', 'CAD/JPY', 'NZD/JPY',
             'AUD/CHF', 'AUD/CAD', 'AUD/NZD',
             'CAD/CHF', 'NZD/CHF', 'NZD/CAD'
-        ]
+        )
+        self._n_pairs = len(self.forex_pairs)
         
         # RSI thresholds
         self.rsi_oversold = 30
         self.rsi_overbought = 70
         
-        # Track last alert times to avoid spam
-        self.last_alerts = {}
+        # Track last alert times (time.monotonic() seconds) to avoid spam
+        self.last_alerts: Dict[str, float] = {}
+        
+        # RSI results keyed by (symbol, interval, latest candle datetime)
+        self._rsi_cache: OrderedDict = OrderedDict()
+        self.rsi_cache_size = 512
+        
+        # Pairs that returned errors or no data, skipped until the next candle close
+        self._neg_cache: Dict[tuple, datetime] = {}
+        self.interval_minutes = {'1h': 60, '4h': 240}
+        
+        # Running Wilder averages per (symbol, interval):
+        # (avg_gain, avg_loss, last closed candle datetime, last closed candle price)
+        self._rsi_state: Dict[tuple, tuple] = {}
+        self.seed_outputsize = 50  # Enough history to seed the RSI averages
+        self.update_outputsize = 3  # Latest candle, last closed candle and the one before it
         
         # API usage tracking
         self.daily_requests = 0
         self.last_reset = datetime.now().date()
         self.max_daily_requests = 780  # 28 pairs × ~28 checks/day
         
+        # Concurrency and pacing for TwelveData requests
+        self.max_concurrent_requests = 8
+        self.api_requests_per_minute = 8  # TwelveData free plan: 8 credits per minute
+        self._sem = asyncio.Semaphore(self.max_concurrent_requests)
+        self._bucket = AsyncTokenBucket(self.api_requests_per_minute, per=60.0)
+        self.batch_size = 8  # Symbols per TwelveData request
+        
         # Timezone setup
-        self.ist = pytz.timezone('Asia/Kolkata')
-        self.utc = pytz.timezone('UTC')
+        self.ist = IST
+        self.utc = timezone.utc
         
         # Sleep hours in IST (2 AM - 5 AM)
         self.sleep_start_hour = 2
         self.sleep_end_hour = 5
         
+        # Seconds to wait after a candle close before fetching it
+        self.candle_close_delay = 5
+        
         if not all([self.telegram_token, self.twelvedata_api_key, self.chat_id]):
             raise ValueError("Missing required environment variables")
         
         self.bot = Bot(token=self.telegram_token)
-    
-    def is_sleep_time(self) -> bool:
-        """Check if it's sleep time in IST (2 AM - 5 AM)"""
-        ist_now = datetime.now(self.ist)
-        current_hour = ist_now.hour
-        return self.sleep_start_hour <= current_hour < self.sleep_end_hour
-    
-    def get_next_candle_close_times(self) -> Dict[str, datetime]:
-        """Calculate next candle close times for 1h and 4h timeframes"""
-        utc_now = datetime.now(self.utc)
         
-        # Next 1-hour candle close (every hour at :00)
-        next_1h = utc_now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        # Shared HTTP/2 client (created in start() so it binds to the running loop)
+        self.http: Optional[httpx.AsyncClient] = None
+        
+        # Alerts are queued and sent by a background task. All messages go to one chat,
+        # where Telegram allows about one message per second.
+        self._tg_queue: asyncio.Queue = asyncio.Queue()
+        self._tg_task: Optional[asyncio.Task] = None
+        self.telegram_message_interval = 1.0
+        self.telegram_max_attempts = 3
+        
+        # Alert cooldowns, API usage and RSI state survive restarts in a small SQLite store.
+        # Changes are flushed in the background every few seconds rather than on each update.
+        self.state_path = os.getenv('STATE_DB_PATH', 'state.db')
+        self.state_flush_interval = 30
+        self._state_dirty = False
+        self._state_task: Optional[asyncio.Task] = None
+        self._db = sqlite3.connect(self.state_path, isolation_level=None)
+        self._db.execute("CREATE TABLE IF NOT EXISTS kv(k TEXT PRIMARY KEY, v BLOB)")
+        self.load_state()
+    
+    async def start(self):
+        """Open the shared HTTP client and start the Telegram sender"""
+        if self.http is None or self.http.is_closed:
+            self.http = httpx.AsyncClient(
+                http2=True,
+                timeout=15,
+                # Keep the connection to TwelveData open between rate-limited batches
+                limits=httpx.Limits(max_connections=16, max_keepalive_connections=16, keepalive_expiry=120)
+            )
         
-        # Next 4-hour candle close (00:00, 04:00, 08:00, 12:00, 16:00, 20:00 UTC)
-        current_hour = utc_now.hour
-        next_4h_hour = ((current_hour // 4) + 1) * 4
-        if next_4h_hour >= 24:
-            next_4h = utc_now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
-        else:
-            next_4h = utc_now.replace(hour=next_4h_hour, minute=0, second=0, microsecond=0)
+        if self._tg_task is None or self._tg_task.done():
+            self._tg_task = asyncio.create_task(self.run_telegram_sender())
         
-        return {
-            '1h': next_1h,
-            '4h': next_4h
-        }
+        if self._state_task is None or self._state_task.done():
+            self._state_task = asyncio.create_task(self.run_state_flusher())
+    
+    async def close(self):
+        """Flush queued alerts, stop the Telegram sender and close the shared HTTP client"""
+        if self._tg_task is not None:
+            try:
+                await asyncio.wait_for(self._tg_queue.join(), timeout=10)
+            except asyncio.TimeoutError:
+                logger.warning(f"Dropping {self._tg_queue.qsize()} unsent Telegram messages")
+            self._tg_task.cancel()
+            self._tg_task = None
+        
+        if self.http is not None and not self.http.is_closed:
+            await self.http.aclose()
+        self.http = None
+        
+        if self._state_task is not None:
+            self._state_task.cancel()
+            self._state_task = None
+        self.save_state()
+        self._db.close()
     
-    def should_check_timeframe(self, timeframe: str) -> bool:
-        """Check if it's time to check a specific timeframe"""
-        utc_now = datetime.now(self.utc)
-        current_minute = utc_now.minute
-        current_hour = utc_now.hour
+    def load_state(self):
+        """Restore persisted alert cooldowns, API usage and RSI state"""
+        try:
+            stored = {k: orjson.loads(v) for k, v in self._db.execute("SELECT k, v FROM kv")}
+        except (sqlite3.Error, orjson.JSONDecodeError) as e:
+            logger.error(f"Failed to load saved state from {self.state_path}: {e}")
+            return
         
-        # Only check within 2 minutes of candle close
-        if current_minute > 2:
-            return False
+        # Cooldowns are saved as wall-clock times and mapped back onto the monotonic clock
+        offset = time.monotonic() - time.time()
+        for key, alert_time in stored.get('last_alerts', {}).items():
+            self.last_alerts[key] = alert_time + offset
         
-        if timeframe == '1h':
-            # Check every hour at the top of the hour
-            return True
-        elif timeframe == '4h':
-            # Check only at 4-hour intervals (00:00, 04:00, 08:00, 12:00, 16:00, 20:00 UTC)
-            return current_hour % 4 == 0
+        if 'daily_requests' in stored:
+            self.daily_requests = stored['daily_requests']['count']
+            self.last_reset = datetime.fromisoformat(stored['daily_requests']['date']).date()
         
-        return False
+        for symbol, interval, avg_gain, avg_loss, last_datetime, last_close in stored.get('rsi_state', []):
+            self._rsi_state[(symbol, interval)] = (avg_gain, avg_loss, last_datetime, last_close)
+        
+        if stored:
+            logger.info(f"Restored saved state: {self.daily_requests} API requests today, "
+                        f"{len(self.last_alerts)} alert cooldowns, {len(self._rsi_state)} RSI states")
+    
+    def save_state(self):
+        """Write alert cooldowns, API usage and RSI state to the state store"""
+        offset = time.time() - time.monotonic()
+        state = {
+            'last_alerts': {key: alert_time + offset for key, alert_time in self.last_alerts.items()},
+            'daily_requests': {'count': self.daily_requests, 'date': self.last_reset.isoformat()},
+            'rsi_state': [[*key, *value] for key, value in self._rsi_state.items()]
+        }
+        
+        try:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT OR REPLACE INTO kv(k, v) VALUES (?, ?)",
+                [(k, orjson.dumps(v)) for k, v in state.items()]
+            )
+            self._db.execute("COMMIT")
+            self._state_dirty = False
+        except sqlite3.Error as e:
+            if self._db.in_transaction:
+                self._db.execute("ROLLBACK")
+            logger.error(f"Failed to save state to {self.state_path}: {e}")
+    
+    async def run_state_flusher(self):
+        """Periodically save state if it changed"""
+        while True:
+            await asyncio.sleep(self.state_flush_interval)
+            if self._state_dirty:
+                self.save_state()
+    
+    def is_sleep_time(self, utc_now: datetime) -> bool:
+        """Check if it's sleep time in IST (2 AM - 5 AM)"""
+        ist_now = utc_now.astimezone(self.ist)
+        current_hour = ist_now.hour
+        return self.sleep_start_hour <= current_hour < self.sleep_end_hour
     
     def reset_daily_counter(self):
         """Reset daily request counter if it's a new day"""
@@ -107,112 +294,293 @@ class ForexRSIBot:
         if current_date > self.last_reset:
             self.daily_requests = 0
             self.last_reset = current_date
+            self._state_dirty = True
             logger.info("Daily request counter reset")
     
-    def can_make_request(self) -> bool:
-        """Check if we can make another API request"""
+    def can_make_request(self, count: int = 1) -> bool:
+        """Check if we can make `count` more API requests"""
         self.reset_daily_counter()
-        return self.daily_requests < self.max_daily_requests
+        return self.daily_requests + count <= self.max_daily_requests
     
-    async def calculate_rsi(self, prices: List[float], period: int = 14) -> Optional[float]:
-        """Calculate standard 14-period RSI (Wilder's smoothing method)"""
-        if len(prices) < period + 1:
+    def wilder_averages(self, prices: List[float], period: int = 14) -> Optional[Tuple[float, float]]:
+        """Calculate Wilder-smoothed average gain and loss over a price series"""
+        closes = np.asarray(prices, dtype=np.float64)
+        if closes.size < period + 1:
             return None
         
-        # Calculate price changes
-        deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-        
-        # Separate gains and losses
-        gains = [delta if delta > 0 else 0 for delta in deltas]
-        losses = [-delta if delta < 0 else 0 for delta in deltas]
+        # Separate price changes into gains and losses
+        deltas = np.diff(closes)
+        gains = np.maximum(deltas, 0.0)
+        losses = np.maximum(-deltas, 0.0)
         
         # Calculate initial average for first 14 periods
-        avg_gain = sum(gains[:period]) / period
-        avg_loss = sum(losses[:period]) / period
-        
-        # Apply Wilder's smoothing method for subsequent periods
-        for i in range(period, len(gains)):
-            avg_gain = ((avg_gain * (period - 1)) + gains[i]) / period
-            avg_loss = ((avg_loss * (period - 1)) + losses[i]) / period
-        
+        avg_gain = gains[:period].mean()
+        avg_loss = losses[:period].mean()
+        
+        # Wilder's smoothing is an EMA with alpha = 1/period; unroll the
+        # recurrence into a single weighted sum over the remaining periods
+        remaining = deltas.size - period
+        if remaining > 0:
+            decay = 1.0 - 1.0 / period
+            weights = decay ** np.arange(remaining - 1, -1, -1) / period
+            avg_gain = decay ** remaining * avg_gain + weights @ gains[period:]
+            avg_loss = decay ** remaining * avg_loss + weights @ losses[period:]
+        
+        return float(avg_gain), float(avg_loss)
+    
+    def wilder_step(self, avg_gain: float, avg_loss: float, delta: float, period: int = 14) -> Tuple[float, float]:
+        """Apply one price change to Wilder-smoothed averages"""
+        avg_gain = (avg_gain * (period - 1) + max(delta, 0.0)) / period
+        avg_loss = (avg_loss * (period - 1) + max(-delta, 0.0)) / period
+        return avg_gain, avg_loss
+    
+    def rsi_from_averages(self, avg_gain: float, avg_loss: float) -> float:
+        """Convert average gain and loss into an RSI value"""
         # Avoid division by zero
         if avg_loss == 0:
             return 100.0
         
-        # Calculate RSI
         rs = avg_gain / avg_loss
         rsi = 100 - (100 / (1 + rs))
         
         return round(rsi, 2)
     
-    async def get_forex_data(self, symbol: str, interval: str) -> Optional[Dict]:
-        """Fetch forex data from TwelveData API with rate limiting"""
-        if not self.can_make_request():
-            logger.warning(f"Daily API limit reached. Skipping {symbol} {interval}")
+    def calculate_rsi(self, prices: List[float], period: int = 14) -> Optional[float]:
+        """Calculate standard 14-period RSI (Wilder's smoothing method)"""
+        averages = self.wilder_averages(prices, period)
+        if averages is None:
             return None
+        return self.rsi_from_averages(*averages)
+    
+    def continues_rsi_state(self, symbol: str, interval: str, values: List[Dict]) -> bool:
+        """Check if an update-sized response connects to the stored RSI state"""
+        state = self._rsi_state.get((symbol, interval))
+        if state is None:
+            return False
+        last_datetime = state[2]
+        return any(item['datetime'] == last_datetime for item in values[1:3])
+    
+    def has_current_rsi_state(self, symbol: str, interval: str, utc_now: datetime) -> bool:
+        """Check if the stored RSI state can be continued with an update-sized request
+        
+        An update returns the forming candle and the two before it, so the stored
+        last closed candle must be one or two candles behind the current one.
+        """
+        state = self._rsi_state.get((symbol, interval))
+        if state is None:
+            return False
+        
+        try:
+            last_closed = datetime.fromisoformat(state[2])
+        except ValueError:
+            return False
+        if last_closed.tzinfo is None:
+            last_closed = last_closed.replace(tzinfo=self.utc)
+        
+        behind = self.candle_period(utc_now, interval) - self.candle_period(last_closed, interval)
+        return behind in (1, 2)
+    
+    def update_rsi_state(self, symbol: str, interval: str, values: List[Dict],
+                         prices: np.ndarray, period: int = 14) -> Optional[float]:
+        """Advance the running RSI state for a pair and return the current RSI
+        
+        The state only includes closed candles. The latest (still forming)
+        candle is applied on top of it without being stored.
+        """
+        key = (symbol, interval)
+        state = self._rsi_state.get(key)
+        latest_close = float(prices[-1])
+        closed_price = float(prices[-2])
+        
+        if state is not None:
+            avg_gain, avg_loss, last_datetime, last_close = state
+            if values[1]['datetime'] != last_datetime:
+                if len(values) > 2 and values[2]['datetime'] == last_datetime:
+                    # The previous candle closed since the last update
+                    avg_gain, avg_loss = self.wilder_step(avg_gain, avg_loss, closed_price - last_close, period)
+                    state = (avg_gain, avg_loss, values[1]['datetime'], closed_price)
+                else:
+                    state = None
+        
+        if state is None:
+            averages = self.wilder_averages(prices[:-1], period)
+            if averages is None:
+                return None
+            state = (*averages, values[1]['datetime'], closed_price)
+        
+        self._rsi_state[key] = state
+        self._state_dirty = True
+        avg_gain, avg_loss, _, last_close = state
+        avg_gain, avg_loss = self.wilder_step(avg_gain, avg_loss, latest_close - last_close, period)
+        return self.rsi_from_averages(avg_gain, avg_loss)
+    
+    def candle_period(self, when: datetime, interval: str) -> int:
+        """Index of the candle period containing `when` for the given interval"""
+        return int(when.timestamp()) // (self.interval_minutes[interval] * 60)
+    
+    def mark_no_data(self, symbol: str, interval: str, utc_now: datetime):
+        """Remember that a pair returned no usable data for the current candle"""
+        self._neg_cache[(symbol, interval)] = utc_now
+    
+    def has_no_data(self, symbol: str, interval: str, utc_now: datetime) -> bool:
+        """Check if a pair already returned no usable data during the current candle"""
+        failed_at = self._neg_cache.get((symbol, interval))
+        if failed_at is None:
+            return False
+        
+        if self.candle_period(failed_at, interval) == self.candle_period(utc_now, interval):
+            return True
+        
+        del self._neg_cache[(symbol, interval)]
+        return False
+    
+    def get_cached_rsi(self, symbol: str, interval: str, values: List[Dict], prices: np.ndarray) -> Optional[float]:
+        """Return RSI for the latest candle, computing it only once per candle"""
+        ckey = (symbol, interval, values[0]['datetime'])
+        if ckey in self._rsi_cache:
+            self._rsi_cache.move_to_end(ckey)
+            return self._rsi_cache[ckey]
+        
+        rsi = self.update_rsi_state(symbol, interval, values, prices)
+        if rsi is not None:
+            self._rsi_cache[ckey] = rsi
+            if len(self._rsi_cache) > self.rsi_cache_size:
+                self._rsi_cache.popitem(last=False)
+        return rsi
+    
+    async def get_forex_data(self, symbol: str, interval: str, utc_now: datetime,
+                             outputsize: int = 50) -> Optional[Dict]:
+        """Fetch forex data for a single pair from TwelveData API"""
+        results = await self.get_forex_data_batch([symbol], interval, utc_now, outputsize)
+        return results[symbol]
+    
+    async def get_forex_data_batch(self, symbols: List[str], interval: str, utc_now: datetime,
+                                   outputsize: int = 50) -> Dict[str, Optional[Dict]]:
+        """Fetch forex data for several pairs in one TwelveData request with rate limiting"""
+        results: Dict[str, Optional[Dict]] = {symbol: None for symbol in symbols}
+        
+        pending = []
+        for symbol in symbols:
+            if self.has_no_data(symbol, interval, utc_now):
+                logger.info(f"Skipping {symbol} {interval}: no data earlier this candle")
+            else:
+                pending.append(symbol)
+        
+        if not pending:
+            return results
+        
+        label = ','.join(pending)
+        
+        # TwelveData charges one credit per symbol, even within a batch. Credits are
+        # reserved now so concurrent batches waiting on the bucket can't overrun the cap.
+        if not self.can_make_request(len(pending)):
+            logger.warning(f"Daily API limit reached. Skipping {label} {interval}")
+            return results
+        self.daily_requests += len(pending)
+        first_request, last_request = self.daily_requests - len(pending) + 1, self.daily_requests
+        self._state_dirty = True
         
         url = "https://api.twelvedata.com/time_series"
         params = {
-            'symbol': symbol,
+            'symbol': label,
             'interval': interval,
-            'outputsize': '50',  # Enough for RSI calculation
+            'outputsize': str(outputsize),
             'apikey': self.twelvedata_api_key
         }
         
+        await self._bucket.acquire(len(pending))
+        
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as response:
-                    self.daily_requests += 1
-                    logger.info(f"API request #{self.daily_requests}: {symbol} {interval}")
-                    
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # Check for API error messages
-                        if 'code' in data and data['code'] != 200:
-                            logger.error(f"API error for {symbol} {interval}: {data.get('message', 'Unknown error')}")
-                            return None
-                        
-                        return data
-                    else:
-                        logger.error(f"HTTP error for {symbol} {interval}: {response.status}")
-                        return None
-                        
-        except asyncio.TimeoutError:
-            logger.error(f"Timeout fetching data for {symbol} {interval}")
-            return None
+            response = await self.http.get(url, params=params)
+            logger.info(f"API requests #{first_request}-{last_request}: {label} {interval}")
+            
+            if response.status_code != 200:
+                logger.error(f"HTTP error for {label} {interval}: {response.status_code}")
+                for symbol in pending:
+                    self.mark_no_data(symbol, interval, utc_now)
+                return results
+            
+            data = orjson.loads(response.content)
+            
+            # Check for API error messages covering the whole request
+            if 'code' in data and data['code'] != 200:
+                logger.error(f"API error for {label} {interval}: {data.get('message', 'Unknown error')}")
+                for symbol in pending:
+                    self.mark_no_data(symbol, interval, utc_now)
+                return results
+            
+            # A single symbol returns one series, several return a dict keyed by symbol
+            series = {pending[0]: data} if len(pending) == 1 else data
+            
+            for symbol in pending:
+                item = series.get(symbol)
+                if not item or ('code' in item and item['code'] != 200):
+                    message = item.get('message', 'Unknown error') if item else 'Missing from response'
+                    logger.error(f"API error for {symbol} {interval}: {message}")
+                    self.mark_no_data(symbol, interval, utc_now)
+                    continue
+                results[symbol] = item
+            
+            return results
+                
+        except httpx.TimeoutException:
+            logger.error(f"Timeout fetching data for {label} {interval}")
+            return results
         except Exception as e:
-            logger.error(f"Error fetching data for {symbol} {interval}: {e}")
-            return None
+            logger.error(f"Error fetching data for {label} {interval}: {e}")
+            return results
     
-    async def analyze_pair(self, symbol: str, interval: str) -> Optional[Dict]:
-        """Analyze a forex pair for RSI signals"""
-        data = await self.get_forex_data(symbol, interval)
-        
+    async def analyze_batch(self, symbols: List[str], interval: str, outputsize: int,
+                            utc_now: datetime) -> Dict[str, Optional[Dict]]:
+        """Analyze a batch of forex pairs fetched with a single API request"""
+        async with self._sem:
+            batch = await self.get_forex_data_batch(symbols, interval, utc_now, outputsize)
+            
+            if outputsize == self.update_outputsize:
+                stale = [
+                    symbol for symbol, data in batch.items()
+                    if data and 'values' in data and not self.continues_rsi_state(symbol, interval, data['values'])
+                ]
+                if stale:
+                    # Candles were missed since the last update (e.g. sleep hours), reseed from full history
+                    logger.info(f"Reseeding RSI state for {','.join(stale)} {interval}")
+                    for symbol in stale:
+                        del self._rsi_state[(symbol, interval)]
+                    batch.update(await self.get_forex_data_batch(stale, interval, utc_now, self.seed_outputsize))
+        
+        return {symbol: self.analyze_data(symbol, interval, batch[symbol], utc_now) for symbol in symbols}
+    
+    def parse_closes(self, values: List[Dict]) -> np.ndarray:
+        """Extract closing prices in chronological order (the API returns newest first)"""
+        return np.fromiter((float(item['close']) for item in values[::-1]), dtype=np.float64, count=len(values))
+    
+    def analyze_data(self, symbol: str, interval: str, data: Optional[Dict], utc_now: datetime) -> Optional[Dict]:
+        """Analyze fetched data for a forex pair for RSI signals"""
         if not data or 'values' not in data:
             return None
         
-        # Extract closing prices (reverse to get chronological order)
-        prices = []
+        values = data['values']
         try:
-            for item in reversed(data['values']):
-                prices.append(float(item['close']))
+            prices = self.parse_closes(values)
         except (KeyError, ValueError, TypeError) as e:
             logger.error(f"Error parsing price data for {symbol}: {e}")
             return None
         
-        if len(prices) < 15:  # Need at least 15 prices for 14-period RSI
+        seeded = (symbol, interval) in self._rsi_state
+        min_prices = self.update_outputsize if seeded else 16  # 15 closed prices for 14-period RSI + latest
+        if len(prices) < min_prices:
             logger.warning(f"Insufficient data for {symbol} {interval}: {len(prices)} prices")
+            self.mark_no_data(symbol, interval, utc_now)
             return None
         
-        # Calculate RSI
-        rsi = await self.calculate_rsi(prices)
+        current_price = float(prices[-1])
+        timestamp = values[0]['datetime']
+        
+        # Calculate RSI (reused if this candle was already processed)
+        rsi = self.get_cached_rsi(symbol, interval, values, prices)
         if rsi is None:
             return None
         
-        current_price = prices[-1]
-        timestamp = data['values'][0]['datetime']
-        
         return {
             'symbol': symbol,
             'interval': interval,
@@ -223,9 +591,6 @@ class ForexRSIBot:
     
     def should_send_alert(self, symbol: str, interval: str, rsi: float) -> bool:
         """Check if an alert should be sent based on RSI levels and timing"""
-        key = f"{symbol}_{interval}"
-        current_time = datetime.now()
-        
         # Check if RSI is in alert zones
         is_oversold = rsi <= self.rsi_oversold
         is_overbought = rsi >= self.rsi_overbought
@@ -234,27 +599,20 @@ class ForexRSIBot:
             return False
         
         # Check cooldown period (4 hours for same pair/timeframe to avoid spam)
+        key = f"{symbol}_{interval}"
+        current_time = time.monotonic()
         if key in self.last_alerts:
-            time_diff = (current_time - self.last_alerts[key]).total_seconds()
+            time_diff = current_time - self.last_alerts[key]
             if time_diff < 14400:  # 4 hour cooldown
                 return False
         
         self.last_alerts[key] = current_time
+        self._state_dirty = True
         return True
     
     def format_alert_message(self, analysis: Dict) -> str:
         """Format the alert message for Telegram"""
-        symbol = analysis['symbol']
-        interval = analysis['interval']
-        rsi = analysis['rsi']
-        price = analysis['price']
-        timestamp = analysis['timestamp']
-        
-        # Convert timestamp to IST for display
-        utc_time = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-        ist_time = utc_time.astimezone(self.ist)
-        
-        if rsi <= self.rsi_oversold:
+        if analysis['rsi'] <= self.rsi_oversold:
             signal_type = "🟢 OVERSOLD SIGNAL"
             emoji = "📈"
             action = "Potential BUY opportunity"
@@ -263,184 +621,202 @@ class ForexRSIBot:
             emoji = "📉"
             action = "Potential SELL opportunity"
         
-        message = f"""
-{emoji} RSI ALERT {emoji}
-
-💱 Pair: {symbol}
-⏰ Timeframe: {interval}
-📊 RSI(14): {rsi}
-💰 Price: {price}
-🕐 IST: {ist_time.strftime('%d/%m/%Y %H:%M')}
-
-{signal_type}
-{action}
-
-━━━━━━━━━━━━━━━
-⚠️ Not financial advice
-        """
-        
-        return message.strip()
+        return ALERT_TEMPLATE.substitute(
+            emoji=emoji,
+            symbol=analysis['symbol'],
+            interval=analysis['interval'],
+            rsi=analysis['rsi'],
+            price=analysis['price'],
+            ist_time=_ts_to_ist(analysis['timestamp']),
+            signal_type=signal_type,
+            action=action
+        )
     
     async def send_telegram_message(self, message: str):
-        """Send message to Telegram with error handling"""
-        try:
-            await self.bot.send_message(
-                chat_id=self.chat_id, 
-                text=message
-            )
-            logger.info(f"Alert sent successfully")
-        except Exception as e:
-            logger.error(f"Failed to send Telegram message: {e}")
+        """Send message to Telegram with error handling, waiting out flood control"""
+        for attempt in range(1, self.telegram_max_attempts + 1):
+            try:
+                await self.bot.send_message(
+                    chat_id=self.chat_id, 
+                    text=message
+                )
+                logger.info(f"Alert sent successfully")
+                return
+            except RetryAfter as e:
+                if attempt == self.telegram_max_attempts:
+                    logger.error(f"Failed to send Telegram message after {attempt} attempts: {e}")
+                    return
+                logger.warning(f"Telegram flood control, retrying in {e.retry_after}s")
+                await asyncio.sleep(e.retry_after)
+            except Exception as e:
+                logger.error(f"Failed to send Telegram message: {e}")
+                return
+    
+    def combine_messages(self, messages: List[str]) -> List[str]:
+        """Join messages with a separator, splitting only where Telegram's length limit requires"""
+        combined = []
+        current = ""
+        for message in messages:
+            if current and len(current) + len(ALERT_SEPARATOR) + len(message) > MAX_MESSAGE_LENGTH:
+                combined.append(current)
+                current = ""
+            current = f"{current}{ALERT_SEPARATOR}{message}" if current else message
+        if current:
+            combined.append(current)
+        return combined
     
-    async def monitor_timeframe(self, timeframe: str):
+    async def run_telegram_sender(self):
+        """Send queued Telegram messages one at a time"""
+        while True:
+            message = await self._tg_queue.get()
+            try:
+                await self.send_telegram_message(message)
+            finally:
+                self._tg_queue.task_done()
+            await asyncio.sleep(self.telegram_message_interval)
+    
+    async def monitor_timeframe(self, timeframe: str, utc_now: datetime):
         """Monitor all pairs for a specific timeframe"""
-        if not self.should_check_timeframe(timeframe):
-            return
+        logger.info(f"🔍 Checking {timeframe} timeframe for all {self._n_pairs} pairs...")
         
-        logger.info(f"🔍 Checking {timeframe} timeframe for all {len(self.forex_pairs)} pairs...")
+        alerts = []
         
-        alert_count = 0
+        # Pairs with up-to-date RSI state only need the latest candles, the rest need full
+        # history. Stale state (sleep hours, restarts) is dropped before spending credits on it.
+        seeded = []
+        unseeded = []
+        for symbol in self.forex_pairs:
+            if self.has_current_rsi_state(symbol, timeframe, utc_now):
+                seeded.append(symbol)
+            else:
+                self._rsi_state.pop((symbol, timeframe), None)
+                unseeded.append(symbol)
         
-        # Process pairs with small delays to avoid overwhelming API
-        for i, symbol in enumerate(self.forex_pairs):
-            try:
-                analysis = await self.analyze_pair(symbol, timeframe)
-                
+        batches = []
+        for symbols, outputsize in ((seeded, self.update_outputsize), (unseeded, self.seed_outputsize)):
+            for i in range(0, len(symbols), self.batch_size):
+                batches.append((symbols[i:i + self.batch_size], outputsize))
+        
+        # Analyze batches concurrently; the semaphore and rate limiter keep API usage in check
+        tasks = [self.analyze_batch(symbols, timeframe, outputsize, utc_now) for symbols, outputsize in batches]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        for (symbols, _), batch_result in zip(batches, results):
+            if isinstance(batch_result, Exception):
+                logger.error(f"Error analyzing {','.join(symbols)} {timeframe}: {batch_result}")
+                continue
+            
+            for symbol, analysis in batch_result.items():
                 if analysis:
                     rsi = analysis['rsi']
                     logger.info(f"{symbol} {timeframe}: RSI = {rsi}")
                     
                     if self.should_send_alert(symbol, timeframe, rsi):
-                        message = self.format_alert_message(analysis)
-                        await self.send_telegram_message(message)
-                        alert_count += 1
-                
-                # Small delay between requests (2 seconds)
-                if i < len(self.forex_pairs) - 1:  # Don't delay after last pair
-                    await asyncio.sleep(2)
-                    
-            except Exception as e:
-                logger.error(f"Error analyzing {symbol} {timeframe}: {e}")
-                continue
+                        alerts.append(self.format_alert_message(analysis))
+        
+        messages = self.combine_messages(alerts)
+        for message in messages:
+            self._tg_queue.put_nowait(message)
         
-        if alert_count > 0:
-            logger.info(f"📬 Sent {alert_count} alerts for {timeframe} timeframe")
+        if alerts:
+            logger.info(f"📬 Queued {len(alerts)} alerts in {len(messages)} messages for {timeframe} timeframe")
         else:
             logger.info(f"✅ {timeframe} check complete - no alerts triggered")
     
-    async def send_sleep_message(self):
+    async def send_sleep_message(self, utc_now: datetime):
         """Send sleep notification"""
-        ist_now = datetime.now(self.ist)
+        ist_now = utc_now.astimezone(self.ist)
         wake_time = ist_now.replace(hour=5, minute=0, second=0, microsecond=0)
         if wake_time <= ist_now:
             wake_time += timedelta(days=1)
         
-        message = f"""
-😴 Going to Sleep Mode
-
-🕐 IST Time: {ist_now.strftime('%d/%m/%Y %H:%M')}
-⏰ Wake up at: {wake_time.strftime('%d/%m/%Y %H:%M')} IST
-
-Markets are quiet during these hours.
-Will resume monitoring at 5:00 AM IST.
-
-Sweet dreams! 🌙
-        """
-        await self.send_telegram_message(message.strip())
+        message = SLEEP_TEMPLATE.format(
+            now=ist_now.strftime(DISPLAY_TIME_FORMAT),
+            wake=wake_time.strftime(DISPLAY_TIME_FORMAT)
+        )
+        await self.send_telegram_message(message)
     
-    async def send_wake_message(self):
+    async def send_wake_message(self, utc_now: datetime):
         """Send wake up notification"""
-        ist_now = datetime.now(self.ist)
-        message = f"""
-☀️ Good Morning! Bot is Awake
-
-🕐 IST Time: {ist_now.strftime('%d/%m/%Y %H:%M')}
-🔍 Resuming RSI monitoring...
-📊 Watching {len(self.forex_pairs)} pairs on 1h & 4h timeframes
-
-Ready to catch those RSI signals! 🎯
-        """
-        await self.send_telegram_message(message.strip())
+        ist_now = utc_now.astimezone(self.ist)
+        message = WAKE_TEMPLATE.format(now=ist_now.strftime(DISPLAY_TIME_FORMAT), pairs=self._n_pairs)
+        await self.send_telegram_message(message)
     
-    async def run_monitoring_cycle(self):
-        """Run a single monitoring cycle for both timeframes"""
-        # Check if it's sleep time
-        if self.is_sleep_time():
-            return False  # Signal that we're sleeping
-        
-        utc_now = datetime.now(self.utc)
-        current_minute = utc_now.minute
-        current_hour = utc_now.hour
-        
-        # Only check within first 3 minutes after candle close
-        if current_minute > 3:
-            return True  # Continue monitoring but skip this cycle
-        
-        # Check 1h timeframe (every hour)
-        await self.monitor_timeframe('1h')
+    async def run_timeframe_schedule(self, timeframe: str):
+        """Check a timeframe shortly after every candle close"""
+        period = self.interval_minutes[timeframe] * 60
         
-        # Check 4h timeframe (every 4 hours: 00, 04, 08, 12, 16, 20 UTC)
-        if current_hour % 4 == 0:
-            await self.monitor_timeframe('4h')
-        
-        return True  # Continue monitoring
+        while True:
+            try:
+                # Candle closes are aligned to the UTC epoch (4h closes at 00, 04, 08, 12, 16, 20 UTC)
+                delay = period - time.time() % period + self.candle_close_delay
+                await asyncio.sleep(delay)
+                
+                utc_now = datetime.now(self.utc)
+                if not self.is_sleep_time(utc_now):
+                    await self.monitor_timeframe(timeframe, utc_now)
+                    
+            except Exception as e:
+                logger.error(f"💥 Error in {timeframe} monitoring cycle: {e}")
     
-    async def run_continuous_monitoring(self):
-        """Run continuous monitoring with sleep schedule"""
-        logger.info("🚀 Starting Forex RSI Bot with IST sleep schedule...")
-        
-        # Send startup message
-        ist_now = datetime.now(self.ist)
-        startup_msg = f"""
-🚀 Forex RSI Bot Started!
-
-📊 Monitoring: {len(self.forex_pairs)} pairs
-⏰ Timeframes: 1h & 4h (synced to candle closes)
-📈 RSI Oversold: ≤ {self.rsi_oversold}
-📉 RSI Overbought: ≥ {self.rsi_overbought}
-
-🕐 Current IST: {ist_now.strftime('%d/%m/%Y %H:%M')}
-😴 Sleep Schedule: 2:00 AM - 5:00 AM IST
-
-Expected daily usage: ~{len(self.forex_pairs) * 27} API requests
-        """
-        await self.send_telegram_message(startup_msg.strip())
-        
+    async def run_sleep_watcher(self):
+        """Send sleep/wake notifications when entering or leaving sleep hours"""
         was_sleeping = False
         
         while True:
             try:
-                current_sleep_status = self.is_sleep_time()
+                utc_now = datetime.now(self.utc)
+                current_sleep_status = self.is_sleep_time(utc_now)
                 
                 # Handle sleep transitions
                 if current_sleep_status and not was_sleeping:
                     # Going to sleep
-                    await self.send_sleep_message()
+                    await self.send_sleep_message(utc_now)
                     was_sleeping = True
                     logger.info("😴 Entering sleep mode (2 AM - 5 AM IST)")
                     
                 elif not current_sleep_status and was_sleeping:
                     # Waking up
-                    await self.send_wake_message()
+                    await self.send_wake_message(utc_now)
                     was_sleeping = False
                     logger.info("☀️ Exiting sleep mode - resuming monitoring")
                 
-                # Run monitoring if awake
-                if not current_sleep_status:
-                    await self.run_monitoring_cycle()
-                    # Check every minute when awake to catch candle closes
-                    await asyncio.sleep(60)
-                else:
-                    # Sleep for 10 minutes during sleep hours
-                    await asyncio.sleep(600)
+                # Sleep hours start and end on the hour in IST
+                ist_now = utc_now.astimezone(self.ist)
+                next_hour = ist_now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+                await asyncio.sleep((next_hour - ist_now).total_seconds() + 1)
                 
-            except KeyboardInterrupt:
-                logger.info("👋 Bot stopped by user")
-                break
             except Exception as e:
-                logger.error(f"💥 Error in monitoring cycle: {e}")
+                logger.error(f"💥 Error in sleep watcher: {e}")
                 await asyncio.sleep(300)  # Wait 5 minutes on error
     
+    async def run_continuous_monitoring(self):
+        """Run continuous monitoring with sleep schedule"""
+        logger.info("🚀 Starting Forex RSI Bot with IST sleep schedule...")
+        
+        # Send startup message
+        ist_now = datetime.now(self.ist)
+        startup_msg = STARTUP_TEMPLATE.format(
+            pairs=self._n_pairs,
+            oversold=self.rsi_oversold,
+            overbought=self.rsi_overbought,
+            now=ist_now.strftime(DISPLAY_TIME_FORMAT),
+            daily_requests=self._n_pairs * 27
+        )
+        await self.send_telegram_message(startup_msg)
+        
+        tasks = [
+            asyncio.create_task(self.run_timeframe_schedule('1h')),
+            asyncio.create_task(self.run_timeframe_schedule('4h')),
+            asyncio.create_task(self.run_sleep_watcher())
+        ]
+        
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+    
     async def test_connection(self):
         """Test API connections and send test message"""
         try:
@@ -449,13 +825,13 @@ Expected daily usage: ~{len(self.forex_pairs) * 27} API requests
             logger.info(f"✅ Telegram bot connected: @{me.username}")
             
             # Test TwelveData connection
-            test_data = await self.get_forex_data('EUR/USD', '1h')
+            test_data = await self.get_forex_data('EUR/USD', '1h', datetime.now(self.utc))
             if test_data and 'values' in test_data:
                 logger.info("✅ TwelveData API connected successfully")
                 
                 # Test RSI calculation
-                prices = [float(item['close']) for item in reversed(test_data['values'])]
-                test_rsi = await self.calculate_rsi(prices)
+                prices = self.parse_closes(test_data['values'])
+                test_rsi = self.get_cached_rsi('EUR/USD', '1h', test_data['values'], prices)
                 
                 test_msg = f"""
 🧪 Connection Test Successful!
@@ -465,7 +841,7 @@ Expected daily usage: ~{len(self.forex_pairs) * 27} API requests
 ✅ RSI Calculation: Working (EUR/USD RSI: {test_rsi})
 ✅ Chat ID: {self.chat_id}
 
-🎯 Ready to monitor {len(self.forex_pairs)} forex pairs!
+🎯 Ready to monitor {self._n_pairs} forex pairs!
                 """
                 await self.send_telegram_message(test_msg.strip())
                 return True
@@ -480,9 +856,11 @@ Expected daily usage: ~{len(self.forex_pairs) * 27} API requests
 # Main execution function
 async def main():
     """Main function to run the bot"""
+    bot = None
     try:
         # Initialize bot
         bot = ForexRSIBot()
+        await bot.start()
         
         # Test all connections
         if await bot.test_connection():
@@ -496,6 +874,9 @@ async def main():
     except Exception as e:
         logger.error(f"💥 Fatal error: {e}")
         raise
+    finally:
+        if bot is not None:
+            await bot.close()
 
 if __name__ == "__main__":
     # Run the bot